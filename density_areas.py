@@ -8,11 +8,387 @@ import sympy as sym # Import the SymPy module
 import numpy as np  # Import the NumPy module
 import numexpr as ne # Import the numexpr module
 
+import ctypes # Import the ctypes module
+import multiprocessing # Import the multiprocessing module
+import queue # Import the queue module
+
+from functools import lru_cache # Import the decorator 'lru_cache' from the 'functools' module
+
+from sympy.utilities.autowrap import autowrap, CodeWrapError # Import 'autowrap' and 'CodeWrapError' from SymPy
+from sympy.utilities.codegen import C99CodeGen # Import the class 'C99CodeGen' from the 'sympy.utilities.codegen' module
+
 from scipy.integrate import quad # Import the function 'quad' from the 'scipy.integrate' sub-package
 from scipy.integrate import dblquad # Import the function 'dblquad' from the 'scipy.integrate' sub-package
+from scipy import LowLevelCallable # Import the class 'LowLevelCallable' from the 'scipy' package
+
+try:
+    # Import the function 'cubature' from the 'scipy.integrate' sub-package (requires SciPy >= 1.15)
+    from scipy.integrate import cubature as scipy_cubature
+except ImportError:
+    scipy_cubature = None
+
+try:
+    # Import the function 'llvm_callable' from the 'sympy.printing.llvmjitcode' module (requires the llvmlite module)
+    from sympy.printing.llvmjitcode import llvm_callable
+except (ImportError, RuntimeError):     # llvmlite is missing, or too recent for the SymPy LLVM JIT printer
+    llvm_callable = None
+
+try:
+    import numba # Import the Numba module
+except ImportError:
+    numba = None
+
+try:
+    import symengine # Import the SymEngine module
+except ImportError:
+    symengine = None
+
+try:
+    import Cython # Import the Cython module, used by the 'cython' backend of 'autowrap'
+except ImportError:
+    Cython = None
+
+try:
+    from cubature import cubature # Import the function 'cubature' from the cubature module
+except ImportError:
+    cubature = None
+
+try:
+    import cupy # Import the CuPy module (requires a CUDA GPU)
+    if not cupy.cuda.is_available():    # CuPy is installed, but no CUDA GPU is usable
+        cupy = None
+except ImportError:
+    cupy = None
+
+# Symbolic variables: Cartesian coordinates (x1, x2) on the unit square, natural coordinates (theta1, theta2) on the
+# 2-torus, spherical coordinates (theta, phi) on the 2-sphere, and the parameters (s, t) of the finite regions on the
+# 2-sphere. They are created once, so that every call shares them
+_X1, _X2 = sym.symbols('x1 x2', real=True)
+_THETA1, _THETA2 = sym.symbols('theta1 theta2', real=True)
+_THETA, _PHI = sym.symbols('theta phi', real=True, positive=True)
+_S, _T = sym.symbols('s t', real=True)
+
+# Maximal number of integrands, lambdified functions and compiled functions cached each. The caches are bounded, so
+# that a sweep over many densities does not keep every compiled integrand in memory
+_CACHE_SIZE = 128
+
+# Maximal number of operations of the integrand of a Poisson bracket for it to be integrated symbolically when
+# numerical == 'auto'. SymPy may take seconds to integrate larger integrands, whereas 'dblquad' takes milliseconds
+_AUTO_MAX_OPS = 20
+
+# Maximal time in seconds of the symbolic integration when numerical == 'auto', after which the computation is numerical
+_AUTO_TIMEOUT = 5
+
+# Minimal number of operations of an integrand for it to be compiled with Numba, which takes a few tenths of a second.
+# Smaller integrands are evaluated by 'dblquad' through NumPy in less time
+_NUMBA_MIN_OPS = 600
+
+# Minimal number of operations of an integrand for it to be compiled with 'autowrap', which takes a couple of seconds.
+# Smaller integrands are evaluated by 'dblquad' through NumPy in a fraction of that time
+_AUTOWRAP_MIN_OPS = 1000
+
+# Maximal number of evaluations of the integrand by the adaptive cubature of the cubature module
+_CUBATURE_MAX_EVAL = 500000
+
+# Functions that SymEngine differentiates natively. Any other function of SymPy is wrapped by SymEngine into an opaque
+# function, whose derivative may silently be wrong
+_SYMENGINE_FUNCTIONS = frozenset(['sin', 'cos', 'tan', 'cot', 'sec', 'csc', 'asin', 'acos', 'atan', 'acot', 'asec',
+                                  'acsc', 'sinh', 'cosh', 'tanh', 'coth', 'sech', 'csch', 'asinh', 'acosh', 'atanh',
+                                  'acoth', 'asech', 'acsch', 'exp', 'log', 'LambertW'])
+
+# Functions that the LLVM JIT and 'autowrap' compile into calls to the C math library. Any other function would be an
+# unresolved symbol in the compiled code. 'area_Omega_S2' also treats the regions made of them as smooth
+_LIBM_FUNCTIONS = frozenset(['sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh',
+                             'asinh', 'acosh', 'atanh', 'exp', 'log'])
+
+
+@lru_cache(maxsize=None)
+def _parse(expression):
+    """ Converts a string literal expression into a symbolic expression. The result is cached, so that
+        repeated calls with the same string literal expression do not parse it again.
+    """
+    return sym.sympify(expression)
+
+
+def _symengine_bracket(tau, ff, hh, coordinates):
+    """ Computes the Poisson bracket (dff/du1 * dhh/du2 - dhh/du1 * dff/du2) * tau of the symbolic expressions tau,
+        ff and hh with SymEngine, where (u1, u2) is the pair of symbolic variables 'coordinates', and converts it back
+        into a symbolic expression of SymPy. Returns None if tau, ff or hh contain a function that SymEngine does not
+        support natively (see _SYMENGINE_FUNCTIONS), or if SymEngine is unable to differentiate ff or hh.
+    """
+    if any(type(function).__name__ not in _SYMENGINE_FUNCTIONS
+           for expression in (tau, ff, hh) for function in expression.atoms(sym.Function)):
+        return None
+
+    u1, u2 = (symengine.Symbol(u.name) for u in coordinates)
+
+    try:
+        # Convert tau, ff and hh into symbolic expressions of SymEngine, in that order
+        tau, ff, hh = symengine.sympify(tau), symengine.sympify(ff), symengine.sympify(hh)
+
+        # Compute the partial derivatives of ff and hh, once each, and the Poisson bracket
+        dff_du1, dff_du2 = symengine.diff(ff, u1), symengine.diff(ff, u2)
+        dhh_du1, dhh_du2 = symengine.diff(hh, u1), symengine.diff(hh, u2)
+        bracket_ff_hh = sym.sympify((dff_du1 * dhh_du2 - dhh_du1 * dff_du2) * tau)
+    except (RuntimeError, symengine.SympifyError):  # SymEngine does not support some function of ff or hh
+        return None
+
+    if bracket_ff_hh.has(sym.Derivative):   # SymEngine left some derivative unevaluated
+        return None
+
+    # Express the Poisson bracket in the symbolic variables u1 and u2 of SymPy
+    return bracket_ff_hh.xreplace({sym.Symbol(u.name): u for u in coordinates})
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _integrand(tau, rho, function1, function2, coordinates, weight='1', trigsimp=False, expand=False):
+    """ Computes the integrand (df/du1 * dh/du2 - dh/du1 * df/du2) * tau * rho * weight of the double integral
+        defining the Poisson bracket of two linear functionals, where (u1, u2) is the pair of symbolic variables
+        'coordinates'. The Poisson bracket is computed with SymEngine if it is available, and with SymPy otherwise.
+        If trigsimp == True, the Poisson bracket is simplified with 'sym.trigsimp' before being multiplied by rho
+        and weight. If expand == True, the integrand is expanded with 'sym.expand_trig' and 'sym.expand' into a sum
+        of terms, which 'sym.integrate' integrates one by one. The last _CACHE_SIZE results are cached, keyed on the
+        string literal expressions.
+    """
+    u1, u2 = coordinates
+
+    # Convert the string literal expressions tau, rho, function1 and function2 into symbolic variables, in that order,
+    # and express them in the symbolic variables u1 and u2. 'xreplace' swaps the symbols of the same name literally,
+    # without the pattern matching done by 'subs'
+    coordinate_symbols = {sym.Symbol(u.name): u for u in (u1, u2)}
+    tau = _parse(tau).xreplace(coordinate_symbols)
+    rho = _parse(rho).xreplace(coordinate_symbols)
+    ff = _parse(function1).xreplace(coordinate_symbols)
+    hh = _parse(function2).xreplace(coordinate_symbols)
+
+    # Compute the Poisson bracket of function1 and function2 induced by pi_{tau}:
+    # (dff/du1 * dhh/du2 - dhh/du1 * dff/du2) * tau
+    bracket_ff_hh = None
+    if symengine is not None:
+        bracket_ff_hh = _symengine_bracket(tau, ff, hh, coordinates)
+    if bracket_ff_hh is None:
+        # Compute the partial derivatives of function1 and function2 with SymPy, once each
+        dff_du1, dff_du2 = sym.diff(ff, u1), sym.diff(ff, u2)
+        dhh_du1, dhh_du2 = sym.diff(hh, u1), sym.diff(hh, u2)
+        bracket_ff_hh = (dff_du1 * dhh_du2 - dhh_du1 * dff_du2) * tau
+    if trigsimp == True:
+        bracket_ff_hh = sym.trigsimp(bracket_ff_hh)
+
+    # Compute the integrand of the double integral
+    integrand = bracket_ff_hh * rho * _parse(weight).xreplace(coordinate_symbols)
+    if expand == True:
+        integrand = sym.expand(sym.expand_trig(integrand))
+
+    # Return the integrand of the double integral
+    return integrand
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _lambdified(integrand, coordinates):
+    """ Transforms the symbolic expression 'integrand' into a NumPy function of the pair of symbolic variables
+        'coordinates'. The last _CACHE_SIZE results are cached, keyed on the symbolic expression.
+    """
+    return sym.lambdify(coordinates, integrand, 'numpy')
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _compiled(integrand, coordinates):
+    """ Compiles the symbolic expression 'integrand', a function of the pair of symbolic variables 'coordinates', into
+        machine code and wraps it into a scipy.LowLevelCallable, so that 'dblquad' evaluates it without calling back
+        into Python. The LLVM JIT of SymPy is tried first, then Numba for an integrand of at least _NUMBA_MIN_OPS
+        operations. Otherwise, an integrand of at least _AUTOWRAP_MIN_OPS operations, whose functions are all in the
+        C math library, is compiled into a C function with 'autowrap', which 'dblquad' still calls through Python.
+        Falls back to the NumPy function given by '_lambdified' if none of the llvmlite, Numba or Cython modules is
+        available, or the integrand is too small or cannot be compiled. The last _CACHE_SIZE results are cached, keyed
+        on the symbolic expression, so that the Poisson brackets on Q, T^2 and S^2 share the compiled integrands.
+    """
+    original, integrand = integrand, integrand.evalf()
+
+    if integrand.free_symbols <= set(coordinates):
+        # Compile only the integrands whose functions are all in the C math library
+        in_libm = all(type(function).__name__ in _LIBM_FUNCTIONS for function in integrand.atoms(sym.Function))
+        operations = sym.count_ops(integrand)
+
+        if llvm_callable is not None and in_libm:
+            try:
+                callback = llvm_callable(list(coordinates), integrand, callback_type='scipy.integrate')
+            except TypeError:   # The integrand contains expressions unsupported by the LLVM JIT, e.g. complex numbers
+                pass
+            else:
+                # Recast the callback to the signature 'double (int, double *)' expected by scipy.integrate
+                signature = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_int, ctypes.POINTER(ctypes.c_double))
+                return LowLevelCallable(signature(ctypes.cast(callback, ctypes.c_void_p).value))
+
+        if numba is not None and operations >= _NUMBA_MIN_OPS:
+            # Lambdify with the 'math' module, which Numba is able to compile
+            function = numba.njit(sym.lambdify(coordinates, integrand, 'math'))
+
+            def callback(n, xx):
+                return function(xx[0], xx[1])
+
+            try:
+                callback = numba.cfunc('float64(intc, CPointer(float64))')(callback)
+            except numba.core.errors.NumbaError:    # The integrand contains functions unsupported by Numba
+                pass
+            else:
+                return LowLevelCallable(callback.ctypes)
+
+        if Cython is not None and in_libm and operations >= _AUTOWRAP_MIN_OPS:
+            # Generate C code, with the common subexpressions of the integrand eliminated, and compile it
+            try:
+                return autowrap(integrand, backend='cython', args=list(coordinates), code_gen=C99CodeGen(cse=True))
+            except (CodeWrapError, ImportError):    # The C code could not be compiled, or its module not be loaded
+                pass
+
+    return _lambdified(original, coordinates)
+
+
+def _numerical_dblquad(integrand, limits1, limits2, prefactor=1):
+    """ Computes numerically the double integral of prefactor * integrand over the limits (u1, a, b) and (u2, c, d),
+        in that order, with the integrand compiled by '_compiled'. The float prefactor multiplies the result of
+        'dblquad', instead of being compiled into the integrand and evaluated at every sample point.
+
+        Returns: a tuple (numerical approximation of the double integral, estimated error)
+    """
+    (u1, a, b), (u2, c, d) = limits1, limits2
+
+    # 'dblquad' integrates its first argument, here u1, over the inner limits
+    integral, error = dblquad(_compiled(integrand, (u1, u2)), float(c), float(d), float(a), float(b))
+    return (prefactor * integral, abs(prefactor) * error)
+
+
+def _integrate(integrand, limits1, limits2):
+    """ Computes symbolically the double integral of 'integrand' over the limits (u1, a, b) and (u2, c, d), in that
+        order. If the integrand is a polynomial in u1 and u2, the double integral is summed exactly term by term.
+        Otherwise, common subexpressions that do not depend on u1 and u2 are factored out with 'sym.cse' and held
+        as constants during the integration, so that they are not expanded again at every step.
+    """
+    (u1, a, b), (u2, c, d) = limits1, limits2
+    coordinates = {u1, u2}
+
+    if integrand.is_polynomial(u1, u2):
+        # Integrate each term coeff * u1**i * u2**j of the polynomial as
+        # coeff * (b**(i+1) - a**(i+1))/(i+1) * (d**(j+1) - c**(j+1))/(j+1)
+        terms = sym.Poly(integrand, u1, u2).terms()
+        return sym.Add(*[coeff * (b**(i + 1) - a**(i + 1)) / (i + 1) * (d**(j + 1) - c**(j + 1)) / (j + 1)
+                         for (i, j), coeff in terms])
+
+    # Eliminate the common subexpressions of the integrand. The replacement symbols are named '_cse0', '_cse1', ...,
+    # so that they do not clash with the coordinates
+    reduced, (integrand,) = sym.cse(integrand, symbols=sym.numbered_symbols('_cse'))
+
+    # Only subexpressions free of the coordinates can be held constant: substitute back the remaining ones
+    constants, variables = [], {}
+    for symbol, subexpression in reduced:
+        subexpression = subexpression.xreplace(variables)
+        if subexpression.free_symbols & coordinates:
+            variables[symbol] = subexpression
+        else:
+            constants.append((symbol, subexpression))
+    integrand = integrand.xreplace(variables)
+
+    # Compute the double integral
+    integral = sym.integrate(integrand, limits1)
+    integral = sym.integrate(integral, limits2)
+
+    # Substitute back the constant subexpressions, latest first since they may refer to earlier ones
+    for symbol, subexpression in reversed(constants):
+        integral = integral.xreplace({symbol: subexpression})
+    return integral
+
+
+def _auto_numerical(integrand, coordinates):
+    """ Indicates whether the double integral of 'integrand' may be computed numerically when numerical == 'auto'.
+        This requires that the integrand depends on no parameter other than the pair of symbolic variables
+        'coordinates', and is not a polynomial in them, which '_integrate' integrates exactly whatever its size.
+    """
+    return integrand.free_symbols <= set(coordinates) and not integrand.is_polynomial(*coordinates)
+
+
+def _integrate_worker(results, integrand, limits1, limits2):
+    """ Computes the double integral of 'integrand' with '_integrate' in a worker process of '_bounded_integrate', and
+        puts it into the queue 'results', or None if SymPy raised an error.
+    """
+    try:
+        results.put(_integrate(integrand, limits1, limits2))
+    except Exception:   # SymPy failed: let the caller compute the double integral numerically
+        results.put(None)
+
+
+def _bounded_integrate(integrand, limits1, limits2, timeout):
+    """ Computes symbolically the double integral of 'integrand' over the limits (u1, a, b) and (u2, c, d) with
+        '_integrate', in a worker process. Returns None if the integration fails or does not finish within 'timeout'
+        seconds, in which case the worker process is terminated, so that it does not keep running in the background.
+    """
+    results = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_integrate_worker, args=(results, integrand, limits1, limits2),
+                                     daemon=True)
+    worker.start()
+    try:
+        # Read the result before joining the worker process, which may otherwise block on a full queue
+        return results.get(timeout=timeout)
+    except queue.Empty:     # The integration did not finish in time
+        return None
+    finally:
+        worker.terminate()
+        worker.join()
+
+
+def _separated_dblquad(expression, limits1, limits2):
+    """ Computes numerically the double integral of the symbolic expression 'expression' over the limits (u1, a, b)
+        and (u2, c, d). If the expression is the product of a function of u1 and a function of u2, the double
+        integral is computed as the product of two single integrals.
+
+        Returns: a tuple (numerical approximation of the double integral, estimated error)
+    """
+    (u1, a, b), (u2, c, d) = limits1, limits2
+
+    factors = sym.separatevars(expression, symbols=[u1, u2], dict=True)
+    if factors is None:     # The expression couples u1 and u2
+        return dblquad(sym.lambdify([u2, u1], expression, 'numpy'), a, b, c, d)
+
+    # Compute the single integrals with respect to u1 and u2, and propagate their errors to the product
+    coeff = float(factors['coeff'])
+    integral1, error1 = quad(sym.lambdify(u1, factors[u1], 'numpy'), a, b)
+    integral2, error2 = quad(sym.lambdify(u2, factors[u2], 'numpy'), c, d)
+    return (coeff * integral1 * integral2, abs(coeff) * (abs(integral1) * error2 + abs(integral2) * error1))
 
 
-def PoissonWasserstein_R2(tau, rho, function1, function2, numerical=False):
+@lru_cache(maxsize=None)
+def _leggauss(n):
+    """ Computes the nodes and weights of the Gauss-Legendre quadrature of order n on [-1, 1]. The result is cached.
+    """
+    return np.polynomial.legendre.leggauss(n)
+
+
+def _gauss_legendre(function, limits, n, block_size=8, xp=np):
+    """ Computes numerically the integral of a vectorized function of four variables over the box given by the list
+        'limits' of pairs (a, b), with the tensor product of Gauss-Legendre quadratures of order n. The nodes of the
+        last two variables are swept in blocks of block_size x block_size, so that the values of the function on
+        each block (n x n x block_size x block_size) fit in the L2 cache. The function is evaluated on arrays of the
+        module 'xp', which is NumPy by default, or CuPy to evaluate it on a GPU.
+    """
+    # Map the nodes and weights of the Gauss-Legendre quadrature from [-1, 1] to each interval [a, b]
+    x, w = _leggauss(n)
+    nodes = [xp.asarray((b - a) / 2 * x + (a + b) / 2) for a, b in limits]
+    weights = [xp.asarray((b - a) / 2 * w) for a, b in limits]
+
+    # Shape the nodes of the first two variables so that they broadcast against every block
+    u1 = nodes[0][:, None, None, None]
+    u2 = nodes[1][None, :, None, None]
+
+    # Evaluate the function block by block, and contract its values with the weights
+    integral = 0.0
+    for i in range(0, n, block_size):
+        u3, w3 = nodes[2][None, None, i:i + block_size, None], weights[2][i:i + block_size]
+        for j in range(0, n, block_size):
+            u4, w4 = nodes[3][None, None, None, j:j + block_size], weights[3][j:j + block_size]
+            values = xp.broadcast_to(xp.asarray(function(u1, u2, u3, u4)), (n, n, len(w3), len(w4)))
+            integral += xp.einsum('i,j,k,l,ijkl->', weights[0], weights[1], w3, w4, values)
+    return float(integral)
+
+
+def PoissonWasserstein_R2(tau, rho, function1, function2, numerical=False, simplify=False):
     """ Computes the Poisson bracket of two linear functionals on the space P^{OO}(Q), of measures with a smooth 
         positive density function on the open unit square Q = (0, 1) x (0, 1), at a measure in P^{OO}(Q). 
         
@@ -34,57 +410,64 @@ def PoissonWasserstein_R2(tau, rho, function1, function2, numerical=False):
         Parameters
         ==========
         tau: string literal expression 
-            Represents the conformal factor tau in (1)
+            Represents the conformal factor tau in (1), in the variables x1 and x2
 
         rho: string literal expression
-            Represents the density function rho in (1)
+            Represents the density function rho in (1), in the variables x1 and x2
 
         function1: string literal expression
-            Represents the function f in (2)
+            Represents the function f in (2), in the variables x1 and x2
 
         function2: string literal expression
-            Represents the function h in (2)
+            Represents the function h in (2), in the variables x1 and x2
 
-        numerical: Boolean expression, optional
-            Indicates numerical computation. By default, numerical == False.
+        numerical: Boolean expression or 'auto', optional
+            Indicates numerical computation. If numerical == 'auto', the computation is numerical if the integrand
+            in (2) has more than _AUTO_MAX_OPS operations, as counted by 'sym.count_ops', or if SymPy is unable to
+            compute the double integral in (2) within _AUTO_TIMEOUT seconds, and symbolic otherwise. The computation
+            is always symbolic if the integrand in (2) is a polynomial, or depends on parameters other than the
+            variables. By default, numerical == False.
+
+        simplify: Boolean expression, optional
+            Indicates that the integrand in (2) is expanded into a sum of terms before the symbolic computation of
+            the double integral in (2). This may speed up the integration of products of trigonometric functions, but
+            slows down that of trigonometric functions of large multiples of the variables, and may return the double
+            integral in (2) as an unsimplified sum. By default, simplify == False.
 
         Returns: a symbolic expression or a tuple
         =======
             * A symbolic expression of the double integral in (2)
             * A tuple (numerical approximation of the double integral in (2), estimated error)
     """
-    # Define the symbolic variables x1 and x2
-    x1, x2 = sym.symbols('x1 x2')
-
-    # Convert the string literal expressions tau, rho, function1 and function2 into symbolic variables, in that order
-    tau = sym.sympify(tau)  
-    rho = sym.sympify(rho)
-    ff = sym.sympify(function1)
-    hh = sym.sympify(function2)
-
-    # Compute the Poisson bracket of function1 and function2 induced by pi_{tau} in (1):
-    # (dff/dx1 * dhh/dx2 - dhh/dx1 * dff/dx2) * tau
-    bracket_ff_hh = (sym.diff(ff, x1) * sym.diff(hh, x2) - sym.diff(hh, x1) * sym.diff(ff, x2)) * tau
-
     # Compute the integrand of the double integral in (2)
-    integrand = bracket_ff_hh * rho
+    integrand = _integrand(tau, rho, function1, function2, (_X1, _X2))
 
-    if numerical == True:   # Indicate numerical computation
-        # Transform the symbolic variable 'integrand' into a NumPy function that allows a numerical evaluation 
-        integrand = sym.lambdify([x1, x2], integrand, 'numpy')
+    # When numerical == 'auto', only an integrand that may be computed numerically is routed by its number of
+    # operations, and computed numerically if SymPy fails
+    automatic = numerical == 'auto' and _auto_numerical(integrand, (_X1, _X2))
+    if numerical == 'auto':
+        numerical = automatic and sym.count_ops(integrand) > _AUTO_MAX_OPS
 
+    if numerical == True:   # Indicate numerical computation
         # Return a tuple: (numerical approximation of the double integral in (2), estimated error)
-        return dblquad(integrand, 0, 1, lambda x2: 0, lambda x2: 1)
+        return _numerical_dblquad(integrand, (_X1, 0, 1), (_X2, 0, 1))
 
     # Compute the the double integral in (2)
-    integrand = sym.integrate(integrand, (x1, 0, 1))
-    integral = sym.integrate(integrand, (x2, 0, 1))
+    integrand = _integrand(tau, rho, function1, function2, (_X1, _X2), expand=simplify)
+    if automatic:   # Bound the time of the symbolic computation, since SymPy may take minutes on some integrands
+        integral = _bounded_integrate(integrand, (_X1, 0, 1), (_X2, 0, 1), _AUTO_TIMEOUT)
+    else:
+        integral = _integrate(integrand, (_X1, 0, 1), (_X2, 0, 1))
+
+    # SymPy was unable to compute the double integral in (2) in time
+    if automatic and (integral is None or integral.has(sym.Integral)):
+        return PoissonWasserstein_R2(tau, rho, function1, function2, numerical=True)
 
     # Return a symbolic expression of the double integral in (2)
     return integral
 
 
-def PoissonWasserstein_T2(tau, rho, function1, function2, numerical=False):
+def PoissonWasserstein_T2(tau, rho, function1, function2, numerical=False, simplify=False):
     """ Computes the Poisson bracket of two linear functionals on the space P^{OO}(T^2), of measures with a smooth 
         positive density function on the 2-torus T^2, at a measure in P^{OO}(T^2). 
         
@@ -107,57 +490,64 @@ def PoissonWasserstein_T2(tau, rho, function1, function2, numerical=False):
         Parameters
         ==========
         tau: string literal expression 
-            Represents the conformal factor tau in (1)
+            Represents the conformal factor tau in (1), in the variables theta1 and theta2
 
         rho: string literal expression
-            Represents the density function rho in (1)
+            Represents the density function rho in (1), in the variables theta1 and theta2
 
         function1: string literal expression
-            Represents the function f in (2)
+            Represents the function f in (2), in the variables theta1 and theta2
 
         function2: string literal expression
-            Represents the function h in (2)
+            Represents the function h in (2), in the variables theta1 and theta2
 
-        numerical: Boolean expression, optional
-            Indicates numerical computation. By default, numerical == False.
+        numerical: Boolean expression or 'auto', optional
+            Indicates numerical computation. If numerical == 'auto', the computation is numerical if the integrand
+            in (2) has more than _AUTO_MAX_OPS operations, as counted by 'sym.count_ops', or if SymPy is unable to
+            compute the double integral in (2) within _AUTO_TIMEOUT seconds, and symbolic otherwise. The computation
+            is always symbolic if the integrand in (2) is a polynomial, or depends on parameters other than the
+            variables. By default, numerical == False.
+
+        simplify: Boolean expression, optional
+            Indicates that the integrand in (2) is expanded into a sum of terms before the symbolic computation of
+            the double integral in (2). This may speed up the integration of products of trigonometric functions, but
+            slows down that of trigonometric functions of large multiples of the variables, and may return the double
+            integral in (2) as an unsimplified sum. By default, simplify == False.
 
         Returns: a symbolic expression or a tuple
         =======
             * A symbolic expression of the double integral in (2)
             * A tuple (numerical approximation of the double integral in (2), estimated error)
     """
-    # Define the symbolic variables theta1 and theta2
-    theta1, theta2 = sym.symbols('theta1 theta2')
-
-    # Convert the string literal expressions tau, rho, function1 and function2 into symbolic variables, in that order
-    tau = sym.sympify(tau)  
-    rho = sym.sympify(rho)
-    ff = sym.sympify(function1)
-    hh = sym.sympify(function2)
-
-    # Compute the Poisson bracket of function1 and function2 induced by pi_{tau} in (1):
-    # (df/d{theta1} * dh/d{theta2} - dh/d{theta1} * df/d{theta2}) * tau
-    bracket_ff_hh = (sym.diff(ff, theta1) * sym.diff(hh, theta2) - sym.diff(hh, theta1) * sym.diff(ff, theta2)) * tau
-
     # Compute the integrand of the double integral in (2)
-    integrand = bracket_ff_hh * rho
+    integrand = _integrand(tau, rho, function1, function2, (_THETA1, _THETA2))
 
-    if numerical == True:   # Indicate numerical computation
-        # Transform the symbolic variable 'integrand' into a NumPy function that allows a numerical evaluation 
-        integrand = sym.lambdify([theta1, theta2], 1/(4*sym.pi**2) * integrand, 'numpy')
+    # When numerical == 'auto', only an integrand that may be computed numerically is routed by its number of
+    # operations, and computed numerically if SymPy fails
+    automatic = numerical == 'auto' and _auto_numerical(integrand, (_THETA1, _THETA2))
+    if numerical == 'auto':
+        numerical = automatic and sym.count_ops(integrand) > _AUTO_MAX_OPS
 
+    if numerical == True:   # Indicate numerical computation
         # Return a tuple: (numerical approximation of the double integral in (2), estimated error)
-        return dblquad(integrand, 0, 2*sym.pi, lambda theta2: 0, lambda theta2: 2*sym.pi)
+        return _numerical_dblquad(integrand, (_THETA1, 0, 2*np.pi), (_THETA2, 0, 2*np.pi), 1/(4*np.pi**2))
 
     # Compute the the double integral in (2)
-    integrand = sym.integrate(integrand, (theta1, 0, 2*sym.pi))
-    integral = sym.integrate(integrand, (theta2, 0, 2*sym.pi))
+    integrand = _integrand(tau, rho, function1, function2, (_THETA1, _THETA2), expand=simplify)
+    if automatic:   # Bound the time of the symbolic computation, since SymPy may take minutes on some integrands
+        integral = _bounded_integrate(integrand, (_THETA1, 0, 2*sym.pi), (_THETA2, 0, 2*sym.pi), _AUTO_TIMEOUT)
+    else:
+        integral = _integrate(integrand, (_THETA1, 0, 2*sym.pi), (_THETA2, 0, 2*sym.pi))
+
+    # SymPy was unable to compute the double integral in (2) in time
+    if automatic and (integral is None or integral.has(sym.Integral)):
+        return PoissonWasserstein_T2(tau, rho, function1, function2, numerical=True)
 
     # Return a symbolic expression of the double integral in (2)
     return 1/(4*sym.pi**2) * integral
 
 
-def PoissonWasserstein_S2(tau, rho, function1, function2, numerical=False):
+def PoissonWasserstein_S2(tau, rho, function1, function2, numerical=False, simplify=False):
     """ Computes the Poisson bracket of two linear functionals on the space P^{OO}(S^2), of measures with a smooth 
         positive density function on the 2-sphere S^2, at a measure in P^{OO}(S^2). 
         
@@ -184,51 +574,60 @@ def PoissonWasserstein_S2(tau, rho, function1, function2, numerical=False):
         Parameters
         ==========
         tau: string literal expression 
-            Represents the conformal factor tau in (1)
+            Represents the conformal factor tau in (1), in the variables theta and phi
 
         rho: string literal expression
-            Represents the density function rho in (1)
+            Represents the density function rho in (1), in the variables theta and phi
 
         function1: string literal expression
-            Represents the function f in (2)
+            Represents the function f in (2), in the variables theta and phi
 
         function2: string literal expression
-            Represents the function h in (2)
-
-        numerical: Boolean expression, optional
-            Indicates numerical computation. By default, numerical == False.
+            Represents the function h in (2), in the variables theta and phi
+
+        numerical: Boolean expression or 'auto', optional
+            Indicates numerical computation. If numerical == 'auto', the computation is numerical if the integrand
+            in (2) has more than _AUTO_MAX_OPS operations, as counted by 'sym.count_ops', or if SymPy is unable to
+            compute the double integral in (2) within _AUTO_TIMEOUT seconds, and symbolic otherwise. The computation
+            is always symbolic if the integrand in (2) is a polynomial, or depends on parameters other than the
+            variables. By default, numerical == False.
+
+        simplify: Boolean expression, optional
+            Indicates that the integrand in (2) is expanded into a sum of terms before the symbolic computation of
+            the double integral in (2). This may speed up the integration of products of trigonometric functions, but
+            slows down that of trigonometric functions of large multiples of the variables, and may return the double
+            integral in (2) as an unsimplified sum. The Poisson bracket in (2) is simplified with 'sym.trigsimp'
+            before the symbolic computation, whatever the value of simplify. By default, simplify == False.
 
         Returns: a symbolic expression or a tuple
         =======
             * A symbolic expression of the double integral in (2)
             * A tuple (numerical approximation of the double integral in (2), estimated error)
     """
-    # Define the symbolic variables theta and phi
-    theta, phi = sym.symbols('theta phi')
-
-    # Convert the string literal expressions tau, rho, function1 and function2 into symbolic variables, in that order
-    tau = sym.sympify(tau)  
-    rho = sym.sympify(rho)
-    ff = sym.sympify(function1)
-    hh = sym.sympify(function2)
-
-    # Compute the Poisson bracket of function1 and function2 induced by pi_{tau} in (1):
-    # (df/d{theta} * dh/d{phi} - dh/d{theta} * df/d{phi}) * tau
-    bracket_ff_hh = (sym.diff(ff, theta) * sym.diff(hh, phi) - sym.diff(hh, theta) * sym.diff(ff, phi)) * tau
-
     # Compute the integrand of the double integral in (2)
-    integrand = bracket_ff_hh * rho * sym.sin(theta)
+    integrand = _integrand(tau, rho, function1, function2, (_THETA, _PHI), 'sin(theta)')
 
-    if numerical == True:   # Indicate numerical computation
-        # Transform the symbolic variable 'integrand' into a NumPy function that allows a numerical evaluation 
-        integrand = sym.lambdify([theta, phi], 1/(4*sym.pi) * integrand, 'numpy')
+    # When numerical == 'auto', only an integrand that may be computed numerically is routed by its number of
+    # operations, and computed numerically if SymPy fails
+    automatic = numerical == 'auto' and _auto_numerical(integrand, (_THETA, _PHI))
+    if numerical == 'auto':
+        numerical = automatic and sym.count_ops(integrand) > _AUTO_MAX_OPS
 
+    if numerical == True:   # Indicate numerical computation
         # Return a tuple: (numerical approximation of the double integral in (2), estimated error)
-        return dblquad(integrand, 0, 2*np.pi, lambda phi: 0, lambda phi: np.pi)
+        return _numerical_dblquad(integrand, (_THETA, 0, np.pi), (_PHI, 0, 2*np.pi), 1/(4*np.pi))
 
     # Compute the the double integral in (2)
-    integrand = sym.integrate(integrand, (theta, 0, sym.pi))
-    integral = sym.integrate(integrand, (phi, 0, 2*sym.pi))
+    integrand = _integrand(tau, rho, function1, function2, (_THETA, _PHI), 'sin(theta)', trigsimp=True,
+                           expand=simplify)
+    if automatic:   # Bound the time of the symbolic computation, since SymPy may take minutes on some integrands
+        integral = _bounded_integrate(integrand, (_THETA, 0, sym.pi), (_PHI, 0, 2*sym.pi), _AUTO_TIMEOUT)
+    else:
+        integral = _integrate(integrand, (_THETA, 0, sym.pi), (_PHI, 0, 2*sym.pi))
+
+    # SymPy was unable to compute the double integral in (2) in time
+    if automatic and (integral is None or integral.has(sym.Integral)):
+        return PoissonWasserstein_S2(tau, rho, function1, function2, numerical=True)
 
     # Return a symbolic expression of the double integral in (2)
     return 1/(4*sym.pi) * integral
@@ -253,7 +652,7 @@ def area_Omega_S2(Omega_region, I_1, I_2):
         Parameters
         ==========
         Omega_region: string literal expression
-            Represents the finite region in (2)
+            Represents the finite region in (2), in the variables theta, phi, s and t
 
         I_1: a list [a, b]
             Contains two integer or float variables a < b which are the limits of the interval I_1 in (1)
@@ -264,10 +663,98 @@ def area_Omega_S2(Omega_region, I_1, I_2):
         Returns: a tuple (numerical approximation of the quadruple integral in (3), estimated error)
         =======
     """
+    # Define the limits of the quadruple integral in (3)
+    limits_theta, limits_phi = (_THETA, 0, np.pi), (_PHI, 0, 2*np.pi)
+    limits_s, limits_t = (_S, I_1[0], I_1[1]), (_T, I_2[0], I_2[1])
+
+    # Convert the string literal expression Omega_region into a symbolic variable, if SymPy is able to parse it in the
+    # variables theta, phi, s and t
+    variables = {sym.Symbol(u.name): u for u in (_THETA, _PHI, _S, _T)}
+    try:
+        Omega_symbolic = _parse(Omega_region).xreplace(variables)
+    except (sym.SympifyError, SyntaxError, TypeError, ValueError):
+        Omega_symbolic = None
+    # Boolean expressions, such as relations (theta > 1) and their combinations, are left to numexpr
+    if not isinstance(Omega_symbolic, sym.Expr) or not Omega_symbolic.free_symbols <= set(variables.values()):
+        Omega_symbolic = None
+
+    if Omega_symbolic is not None:
+        # Split Omega_region into a factor that depends only on theta and phi, and a factor that depends on s and t
+        Omega_angles, Omega_parameters = Omega_symbolic.as_independent(_S, _T, as_Add=False)
+
+        if not Omega_parameters.free_symbols & {_THETA, _PHI}:
+            # The quadruple integral in (3) is the product of two double integrals, each of which is further split
+            # into single integrals whenever its integrand is separable
+            integral_angles, error_angles = _separated_dblquad(Omega_angles, limits_theta, limits_phi)
+            integral_parameters, error_parameters = _separated_dblquad(Omega_parameters, limits_s, limits_t)
+            area = integral_angles * integral_parameters / (4*np.pi)
+            error = (abs(integral_angles) * error_parameters + abs(integral_parameters) * error_angles) / (4*np.pi)
+
+            # Return a tuple: (numerical approximation of the quadruple integral in (3), estimated error)
+            return (area, error)
+
     # Define Omega_region as a function of theta, phi, s adn t
     def Omega(theta, phi, s, t):
         return ne.evaluate(Omega_region)
 
+    limits = [(0, np.pi), (0, 2*np.pi), (I_1[0], I_1[1]), (I_2[0], I_2[1])]
+    area = None
+    if cupy is not None and Omega_symbolic is not None:
+        # Transform Omega_region into a CuPy function, and compute the quadruple integral in (3) on the GPU with the
+        # tensor product Gauss-Legendre quadratures of orders 64 and 32, each in a single block, whose difference
+        # estimates the error
+        try:
+            Omega_gpu = sym.lambdify([_THETA, _PHI, _S, _T], Omega_symbolic, 'cupy')
+            area = _gauss_legendre(Omega_gpu, limits, 64, block_size=64, xp=cupy)
+            error = abs(area - _gauss_legendre(Omega_gpu, limits, 32, block_size=32, xp=cupy))
+        except Exception:   # CUDA failed, e.g. the driver is too old or the GPU is out of memory: compute on the CPU
+            area = None
+    if area is None:
+        # Compute the quadruple integral in (3) with the tensor product Gauss-Legendre quadratures of orders 32 and
+        # 16, whose difference estimates the error. For a smooth Omega_region both are accurate to machine precision
+        area = _gauss_legendre(Omega, limits, 32)
+        error = abs(area - _gauss_legendre(Omega, limits, 16))
+
+    if error <= max(1.49e-8, 1.49e-8 * abs(area)):
+        # Return a tuple: (numerical approximation of the quadruple integral in (3), estimated error)
+        return (area / (4*np.pi), error / (4*np.pi))
+
+    # Define Omega_region as a function of an array of points (theta, phi, s, t), one point per row
+    def Omega_points(x):
+        return np.broadcast_to(Omega(x[:, 0], x[:, 1], x[:, 2], x[:, 3]), x.shape[:1])
+
+    # The error estimate of the cubature module cannot be trusted on a discontinuous Omega_region, e.g. a Boolean
+    # expression, on which it may falsely converge. It is only used if Omega_region is a symbolic expression of
+    # elementary functions, whose Gauss-Legendre quadratures above may only have failed on account of oscillations
+    smooth = Omega_symbolic is not None and all(type(function).__name__ in _LIBM_FUNCTIONS
+                                                for function in Omega_symbolic.atoms(sym.Function))
+
+    if cubature is not None and smooth:
+        # Compute the quadruple integral in (3) with a single adaptive cubature over [0, pi] x [0, 2*pi] x I_1 x I_2.
+        # The number of evaluations is bounded, so that the cubature does not run for minutes
+        try:
+            area, error = cubature(Omega_points, 4, 1, [0, 0, I_1[0], I_2[0]], [np.pi, 2*np.pi, I_1[1], I_2[1]],
+                                   maxEval=_CUBATURE_MAX_EVAL, vectorized=True)
+        except RuntimeError:    # The cubature failed, e.g. it ran out of memory
+            area, error = None, None
+
+        # Fall back to the cubature of SciPy or to nested 'quad' calls, unless the cubature converged within
+        # _CUBATURE_MAX_EVAL evaluations
+        if area is not None and error[0] <= max(1.49e-8, 1.49e-8 * abs(area[0])):
+            # Return a tuple: (numerical approximation of the quadruple integral in (3), estimated error)
+            return (float(area[0]) / (4*np.pi), float(error[0]) / (4*np.pi))
+
+    if scipy_cubature is not None:
+        # Compute the quadruple integral in (3) with the adaptive cubature of SciPy, which evaluates Omega_region
+        # at whole batches of points. The number of subdivisions is bounded, since a discontinuous Omega_region may
+        # otherwise take hours to converge
+        area = scipy_cubature(Omega_points, [0, 0, I_1[0], I_2[0]], [np.pi, 2*np.pi, I_1[1], I_2[1]], atol=1.49e-8,
+                              max_subdivisions=100)
+
+        if area.status == 'converged':
+            # Return a tuple: (numerical approximation of the quadruple integral in (3), estimated error)
+            return (float(area.estimate) / (4*np.pi), float(area.error) / (4*np.pi))
+
     # Compute the the quadruple integral in (3)
     def integral_theta(phi, s, t):
         return quad(Omega, 0, np.pi, args=(phi, s, t))[0]     # Compute the integral with respect to theta
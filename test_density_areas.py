@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Regression tests for density_areas.py"""
+
+import sympy as sym # Import the SymPy module
+import numpy as np  # Import the NumPy module
+
+import density_areas
+
+
+def test_bracket_with_functions_unsupported_by_symengine():
+    # SymEngine wraps SymPy functions it does not know into opaque functions, whose derivatives may be wrong
+    assert density_areas.PoissonWasserstein_R2(1, 1, 'besselj(0, x1)', 'x2') == -1 + sym.besselj(0, 1)
+    assert density_areas.PoissonWasserstein_R2(1, 1, 'Heaviside(x1 - 1/2)', 'x2') == 1
+    integral = density_areas.PoissonWasserstein_R2(1, 1, 'x1**2*besselj(1, x1)', 'x2')
+    assert abs(float(integral - sym.besselj(1, 1))) < 1e-12
+
+
+def test_auto_small_integrand_is_symbolic():
+    # Integrands of at most _AUTO_MAX_OPS operations are integrated symbolically
+    assert density_areas.PoissonWasserstein_T2('1', '1+cos(theta1)/2', 'sin(theta1)', 'cos(theta1)*sin(theta2)',
+                                               numerical='auto') == 0
+    assert density_areas.PoissonWasserstein_S2('1', '1+cos(theta)/2', 'cos(theta)', 'sin(theta)*cos(phi)+phi',
+                                               numerical='auto') == -sym.pi/4
+
+
+def test_auto_large_integrand_is_numerical():
+    # Integrands of more than _AUTO_MAX_OPS operations are integrated numerically
+    arguments = ('1', 'exp(-x1*x2)*(1+sin(x1)*cos(x2))/(1+x1**2+x2**3)', 'exp(sin(x1))*x2', 'x2*cos(x1)+x1**2')
+    integral, error = density_areas.PoissonWasserstein_R2(*arguments, numerical='auto')
+    assert abs(integral - density_areas.PoissonWasserstein_R2(*arguments, numerical=True)[0]) <= 1e-12
+    assert error < 1e-8
+
+
+def test_auto_parametric_integrand_is_symbolic():
+    # Integrands with free parameters can't be integrated numerically, whatever their number of operations
+    arguments = (1, '1', 'a*x1**3 + b*x1**2*x2 + c*x1*x2**2 + d*x2**3', 'e*x1 + f*x2 + g*x1*x2')
+    assert density_areas.PoissonWasserstein_R2(*arguments, numerical='auto') == \
+        density_areas.PoissonWasserstein_R2(*arguments)
+    assert density_areas.PoissonWasserstein_R2('a', 'exp(b*x1)', 'x1', 'x2', numerical='auto') == \
+        density_areas.PoissonWasserstein_R2('a', 'exp(b*x1)', 'x1', 'x2')
+
+
+def test_area_of_separable_region():
+    # The region of the notebook splits into a factor in theta and phi, and a factor in s and t
+    area, error = density_areas.area_Omega_S2('sin(theta)*cos(phi)', [0.5, 1], [1, 2])
+    assert abs(area) <= 1e-12
+
+
+def test_area_of_coupled_region():
+    # The region couples phi with s and t
+    theta, phi, s, t = sym.symbols('theta phi s t')
+    exact = sym.integrate(sym.sin(theta)*(1 + s*t*sym.cos(phi)**2),
+                          (theta, 0, sym.pi), (phi, 0, 2*sym.pi), (s, sym.S(1)/2, 1), (t, 1, 2)) / (4*sym.pi)
+    area, error = density_areas.area_Omega_S2('sin(theta)*(1 + s*t*cos(phi)**2)', [0.5, 1], [1, 2])
+    assert abs(area - float(exact)) <= 1e-10
+
+
+def test_area_of_boolean_region():
+    # The indicator function of theta > 1 is discontinuous, which the adaptive cubatures must not mistake for
+    # convergence
+    area, error = density_areas.area_Omega_S2('theta > 1', [np.pi/4, 3*np.pi/4], [np.pi/4, 3*np.pi/4])
+    assert abs(area - (np.pi - 1)*np.pi**2/8) <= 1e-8
+
+
+def test_polynomial_integrated_term_by_term():
+    # The exact term-by-term integration of polynomials must agree with sym.integrate, on the unit square as well
+    # as on the limits of the 2-torus
+    a, b, c = sym.symbols('a b c')
+    u1, u2 = density_areas._THETA1, density_areas._THETA2
+    integrand = a*u1**3*u2 + b*u1*u2**2 - c*u2**4 + 2*u1 - 7
+    for limits1, limits2 in [((u1, 0, 1), (u2, 0, 1)), ((u1, 0, 2*sym.pi), (u2, 0, 2*sym.pi)),
+                             ((u1, -1, sym.pi), (u2, sym.S(1)/2, 3))]:
+        integral = density_areas._integrate(integrand, limits1, limits2)
+        assert sym.expand(integral - sym.integrate(integrand, limits1, limits2)) == 0